@@ -36,7 +36,8 @@ CREATE TABLE regions (
     region_name VARCHAR(100) NOT NULL,
     country_id INT NOT NULL REFERENCES countries(country_id) ON DELETE CASCADE,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (region_name, country_id)
 );
 
 CREATE INDEX idx_region_country_id ON regions(country_id);
@@ -49,7 +50,8 @@ CREATE TABLE cities (
     city_name VARCHAR(100) NOT NULL,
     region_id INT NOT NULL REFERENCES regions(region_id) ON DELETE CASCADE,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (city_name, region_id)
 );
 
 CREATE INDEX idx_city_region_id ON cities(region_id);
@@ -3,7 +3,6 @@ This is a stub: adjust schema SQL path and connection details in src/config.py
 """
 import argparse
 from pathlib import Path
-import psycopg2
 import sys
 import os
 
@@ -11,19 +10,18 @@ import os
 # Add the parent directory to Python path to import from src
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.config import get_db_dsn
+from src.db import get_conn
 
 def apply_schema(sql_path):
     """
     Apply the database schema defined in an SQL file to the configured PostgreSQL database.
     
-    Reads SQL from `sql_path` and executes it against the database using the DSN obtained from configuration. Prints "Schema applied." on success.
+    Reads SQL from `sql_path` and executes it against the database using a pooled connection. Prints "Schema applied." on success.
     
     Parameters:
         sql_path (str | pathlib.Path): Path to the SQL schema file to execute.
     """
-    dsn = get_db_dsn()
-    with psycopg2.connect(dsn) as conn:
+    with get_conn() as conn:
         with conn.cursor() as cur:
             sql = Path(sql_path).read_text()
             cur.execute(sql)
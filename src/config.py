@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -14,11 +15,16 @@ DB_NAME = os.getenv('DB_NAME', 'northwind_db')
 DB_USER = os.getenv('DB_USER', 'northwind_admin')
 DB_PASSWORD = os.getenv('DB_PASSWORD', 'northwind123')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', None)
+# Reverse proxies whose X-Forwarded-For header identifies the real client (comma-separated IPs)
+TRUSTED_PROXIES = frozenset(ip.strip() for ip in os.getenv('TRUSTED_PROXIES', '').split(',') if ip.strip())
 
+@lru_cache(maxsize=1)
 def get_db_dsn():
     """
     Construct and return a PostgreSQL DSN string for psycopg2.
 
+    The settings are read once at import, so the string is built on the first call and cached.
+
     Returns:
         str: DSN string with host, port, dbname, user, and password.
     """
@@ -11,19 +11,23 @@ including:
 - Loading normalized CSVs into a PostgreSQL database, including normalization of city/region/country
   hierarchies and referential integrity for location tables.
 - Command-line interface for converting Excel to CSV and loading all normalized data
-  into the database in the correct order.
+  into the database in the correct order, loading independent tables concurrently.
 
 **Main Functions:**
 - `load_excel_sheets(path)`: Read all sheets from an Excel file.
+- `iter_excel_sheets(path)`: Yield the sheets of an Excel file one at a time.
 - `clean_columns(df)`: Normalize DataFrame column names.
 - `handle_missing_values(df)`: Fill missing values appropriately.
+- `clean_and_fill(df)`: Normalize column names and fill missing values in one step.
 - `save_csvs(dfs, out_dir)`: Save cleaned DataFrames to CSV.
 - `load_orders(csv_path)`: Load orders with location hierarchy into the database.
 - `load_generic_csv(...)`: Generic loader for other tables with optional location mapping.
+- `bulk_copy(cur, table, df, columns)`: Stream DataFrame rows into a table with COPY FROM STDIN.
 
 **Helper Functions:**
-- `get_or_create_country`, `get_or_create_region`, `get_or_create_city`: Ensure location
-  hierarchy exists in the database.
+- `resolve_locations(...)`: Ensure the location hierarchy exists in the database and resolve
+  city ids with batched statements per level, inserting only locations not found.
+- `preload_locations(sources)`: Create every location referenced by several CSVs up front.
 
 **Command-Line Usage:**
     python src/data_loader.py --excel path/to/northwind.xlsx
@@ -31,26 +35,52 @@ including:
 **Requirements:**
 - pandas
 - psycopg2
-- src.config.get_db_dsn
+- src.db.get_conn
 """
 
+import io
 import sys
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
 import logging
-import psycopg2
+from psycopg2.extras import execute_values
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.utils import get_or_create_city, get_or_create_country, get_or_create_region, to_snake_case
-from src.config import get_db_dsn
+from src.utils import to_snake_case_index
+from src.db import POOL_MAX_CONN, get_conn
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def iter_excel_sheets(path):
+    """
+    Yield the sheets of an Excel workbook one at a time.
+
+    The workbook is opened once and each sheet is parsed only when requested, so at most
+    one sheet's DataFrame needs to be held in memory by the consumer.
+
+    Args:
+        path (str or Path): Path to the Excel file to read.
+
+    Yields:
+        tuple: (sheet name, pandas DataFrame) for each sheet in the workbook.
+
+    Raises:
+        FileNotFoundError: If the specified Excel file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Excel file not found: {path}")
+    with pd.ExcelFile(path) as xls:
+        for name in xls.sheet_names:
+            yield name, xls.parse(name)
+
+
 def load_excel_sheets(path):
     """
     Read every sheet from an Excel workbook and return them keyed by sheet name.
@@ -64,10 +94,7 @@ def load_excel_sheets(path):
     Raises:
         FileNotFoundError: If the specified Excel file does not exist.
     """
-    path = Path(path)
-    if not path.exists():
-        raise FileNotFoundError(f"Excel file not found: {path}")
-    dfs = pd.read_excel(path, sheet_name=None)
+    dfs = dict(iter_excel_sheets(path))
     logger.info(f"Loaded {len(dfs)} sheets from {path}")
     return dfs
 
@@ -76,65 +103,287 @@ def clean_columns(df):
     """
     Normalize DataFrame column names to snake_case.
 
-    Returns a copy of the input DataFrame with all column names converted to snake_case
-    (whitespace trimmed, camelCase/PascalCase converted, spaces replaced with underscores, and lowercased).
+    Returns a DataFrame with all column names converted to snake_case (whitespace trimmed,
+    camelCase/PascalCase converted, spaces replaced with underscores, and lowercased).
+    Only the column labels change, so the underlying data is shared with `df` rather than copied.
 
     Args:
         df (pd.DataFrame): DataFrame whose column names will be normalized.
 
     Returns:
-        pd.DataFrame: A copy of `df` with cleaned column names.
+        pd.DataFrame: `df` with cleaned column names.
     """
-    df = df.copy()
-    df.columns = [to_snake_case(c) for c in df.columns]
-    return df
+    return df.set_axis(to_snake_case_index(df.columns), axis=1, copy=False)
 
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Fill missing values in a DataFrame according to column types.
+    Fill missing values in a DataFrame according to column types, in place.
 
     - Numeric columns: filled with 0
     - Boolean columns: filled with False
     - Datetime columns: filled with pd.Timestamp('1970-01-01')
     - All other columns: filled with an empty string
 
+    Only columns that actually contain missing values are considered; their fill values are collected
+    first and applied with a single `fillna` call. Frames without gaps are returned untouched.
+
     Args:
         df (pd.DataFrame): Input DataFrame to process.
 
     Returns:
-        pd.DataFrame: A copy of the DataFrame with missing values filled as described.
+        pd.DataFrame: The same DataFrame with missing values filled as described.
     """
-    df = df.copy()
-    for col in df.columns:
+    missing = df.columns[df.isna().any().to_numpy()]
+    if missing.empty:
+        return df
+    fills = {}
+    for col in missing:
         if pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = df[col].fillna(0)
+            fills[col] = 0
         elif pd.api.types.is_bool_dtype(df[col]):
-            df[col] = df[col].fillna(False)
+            fills[col] = False
         elif pd.api.types.is_datetime64_any_dtype(df[col]):
-            df[col] = df[col].fillna(pd.Timestamp('1970-01-01'))
+            fills[col] = pd.Timestamp('1970-01-01')
         else:
-            df[col] = df[col].fillna('')
+            fills[col] = ''
+    df.fillna(fills, inplace=True)
     return df
 
+def clean_and_fill(df):
+    """
+    Normalize column names and fill missing values in a single step.
+
+    Neither step copies the data: the column labels are replaced on a shallow view and the
+    missing values are filled in place, so each sheet is materialized only once.
+
+    Args:
+        df (pd.DataFrame): DataFrame to clean.
+
+    Returns:
+        pd.DataFrame: `df` with snake_case column names and no missing values.
+    """
+    return handle_missing_values(clean_columns(df))
+
 def save_csvs(dfs, out_dir='data/normalized'):
     """
-    Write cleaned DataFrames from a mapping to CSV files in the given output directory.
+    Write cleaned DataFrames to CSV files in the given output directory.
 
     Each DataFrame has its column names normalized and missing values filled before being written.
+    Missing values are filled in place, so the frames in `dfs` are modified. Sheets are written as
+    soon as they are received on a background writer thread, so the next sheet is parsed while the
+    previous one is written; passing `iter_excel_sheets(...)` keeps at most two sheets in memory.
 
     Args:
-        dfs (dict): Mapping of base file name (string) to pandas.DataFrame to save.
+        dfs (dict or iterable): Mapping of base file name (string) to pandas.DataFrame to save,
+            or an iterable of (name, DataFrame) pairs.
         out_dir (str or Path): Directory where CSV files will be created (directory is created if missing).
     """
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    for name, df in dfs.items():
-        clean = clean_columns(df)
-        finished = handle_missing_values(clean)
-        fname = out / f"{name}.csv"
-        finished.to_csv(fname, index=False)
-    logger.info(f"Saved {len(dfs)} tables to {out}")
+    items = dfs.items() if hasattr(dfs, 'items') else dfs
+    count = 0
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        pending = None
+        for name, df in items:
+            fname = out / f"{name}.csv"
+            cleaned = clean_and_fill(df)
+            if pending is not None:
+                pending.result()
+            pending = writer.submit(cleaned.to_csv, fname, index=False)
+            count += 1
+        if pending is not None:
+            pending.result()
+    logger.info(f"Saved {count} tables to {out}")
+
+
+
+ORDER_COLUMNS = [
+    "order_id",
+    "customer_id",
+    "employee_id",
+    "order_date",
+    "required_date",
+    "shipped_date",
+    "ship_via",
+    "freight",
+    "ship_name",
+    "ship_city_id",
+    "ship_postal_code",
+]
+
+
+def bulk_copy(cur, table, df, columns):
+    """
+    Stream the given DataFrame columns into a table with a single COPY FROM STDIN.
 
+    The frame is serialized to an in-memory CSV buffer and sent in one round-trip,
+    replacing one INSERT statement per row. Float columns holding only whole numbers (integer
+    columns that had gaps, e.g. `employee_id`) are written without a decimal point, since COPY
+    into an INT column rejects values like `5.0`.
+
+    Args:
+        cur: psycopg2 cursor.
+        table (str): Target table name.
+        df (pd.DataFrame): Rows to load.
+        columns (list): Column names to copy, in target-table order.
+    """
+    frame = df[columns]
+    integral = {
+        col: "Int64" for col in columns
+        if pd.api.types.is_float_dtype(frame[col]) and (frame[col].dropna() % 1 == 0).all()
+    }
+    if integral:
+        frame = frame.astype(integral)
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False, header=False, na_rep='\\N')
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({','.join(columns)}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')",
+        buf,
+    )
+
+
+def _relax_commit_durability(cur):
+    """
+    Let the current transaction commit without waiting for its WAL flush.
+
+    A crash right after commit can lose the transaction, which is acceptable for a bulk load
+    that can simply be re-run. The setting is `LOCAL`, so it ends with the transaction and never
+    leaks to the next user of a pooled connection.
+
+    Args:
+        cur: psycopg2 cursor inside the load transaction.
+    """
+    cur.execute("SET LOCAL synchronous_commit TO OFF")
+
+
+def _get_or_insert_ids(cur, table, key_cols, id_col, keys):
+    """
+    Insert the missing keys of a lookup table and return the ids of all requested keys.
+
+    Uses `ON CONFLICT DO NOTHING` and reads existing rows back in the same statement, so rows
+    that already exist are not locked and concurrent loads can share them.
+
+    Args:
+        cur: psycopg2 cursor.
+        table (str): Lookup table name.
+        key_cols (list): Columns forming the table's unique key.
+        id_col (str): Primary key column to return.
+        keys (list): Distinct key tuples to resolve.
+
+    Returns:
+        list: (key columns..., id) tuples for every requested key.
+    """
+    if not keys:
+        return []
+    cols = ", ".join(key_cols)
+    return execute_values(cur, f"""
+        WITH input ({cols}) AS (VALUES %s),
+        inserted AS (
+            INSERT INTO {table} ({cols}) SELECT {cols} FROM input
+            ON CONFLICT ({cols}) DO NOTHING
+            RETURNING {cols}, {id_col}
+        )
+        SELECT {cols}, {id_col} FROM inserted
+        UNION ALL
+        SELECT {", ".join(f"t.{c}" for c in key_cols)}, t.{id_col}
+        FROM {table} t JOIN input USING ({cols})
+    """, keys, page_size=len(keys), fetch=True)
+
+
+def _lookup_ids(cur, table, key_cols, id_col, keys):
+    """
+    Return the ids of the requested keys that already exist in a lookup table.
+
+    A plain `SELECT`, unlike `_get_or_insert_ids`: an `INSERT ... ON CONFLICT` draws a sequence
+    value even when it conflicts, so looking keys up first keeps reloads from leaving id gaps.
+
+    Args:
+        cur: psycopg2 cursor.
+        table (str): Lookup table name.
+        key_cols (list): Columns forming the table's unique key.
+        id_col (str): Primary key column to return.
+        keys (list): Distinct key tuples to resolve.
+
+    Returns:
+        list: (key columns..., id) tuples for the keys that exist; missing keys are left out.
+    """
+    if not keys:
+        return []
+    cols = ", ".join(key_cols)
+    return execute_values(cur, f"""
+        SELECT {", ".join(f"t.{c}" for c in key_cols)}, t.{id_col}
+        FROM {table} t JOIN (VALUES %s) AS input ({cols}) USING ({cols})
+    """, keys, page_size=len(keys), fetch=True)
+
+
+def resolve_locations(cur, df, city_col, region_col, country_col):
+    """
+    Resolve the city_id of every row with batched statements per location level.
+
+    Distinct countries, (region, country) pairs and (city, region) pairs are each looked up in a
+    single multi-row statement; only the keys not found are sent to a second statement that
+    inserts them and returns their ids. Once the locations exist (e.g. after `preload_locations`,
+    or on a reload) no insert is attempted, so no sequence values are used up.
+    Empty region names are stored as "Unknown".
+
+    Args:
+        cur: psycopg2 cursor.
+        df (pd.DataFrame): Rows holding city/region/country name columns.
+        city_col (str): Column containing city names.
+        region_col (str): Column containing region names (may be absent from `df`).
+        country_col (str): Column containing country names.
+
+    Returns:
+        pd.Series: city_id for each row, aligned with `df.index`.
+    """
+    locations = pd.DataFrame({
+        "country_name": df[country_col].to_numpy(),
+        "region_name": df[region_col].to_numpy() if region_col in df.columns else '',
+        "city_name": df[city_col].to_numpy(),
+    })
+    locations["region_name"] = locations["region_name"].replace('', "Unknown")
+
+    for table, key_cols, id_col in (
+        ("countries", ["country_name"], "country_id"),
+        ("regions", ["region_name", "country_id"], "region_id"),
+        ("cities", ["city_name", "region_id"], "city_id"),
+    ):
+        keys = locations[key_cols].drop_duplicates().to_numpy().tolist()
+        ids = _lookup_ids(cur, table, key_cols, id_col, keys)
+        found = {tuple(row[:-1]) for row in ids}
+        missing = [key for key in keys if tuple(key) not in found]
+        ids += _get_or_insert_ids(cur, table, key_cols, id_col, missing)
+        locations = locations.merge(pd.DataFrame(ids, columns=key_cols + [id_col]), on=key_cols, how="left")
+
+    return pd.Series(locations["city_id"].to_numpy(), index=df.index)
+
+
+def preload_locations(sources):
+    """
+    Create every location referenced by a set of CSV files in one transaction.
+
+    Running this before concurrent table loads means each load only looks up existing
+    countries, regions and cities instead of racing to insert the same ones.
+
+    Args:
+        sources (list): (csv_path, city_col, region_col, country_col) tuples.
+    """
+    frames = []
+    for csv_path, city_col, region_col, country_col in sources:
+        df = handle_missing_values(pd.read_csv(csv_path))
+        frames.append(pd.DataFrame({
+            "city": df[city_col],
+            "region": df[region_col] if region_col in df.columns else '',
+            "country": df[country_col],
+        }))
+    locations = pd.concat(frames, ignore_index=True).drop_duplicates()
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            _relax_commit_durability(cur)
+            resolve_locations(cur, locations, "city", "region", "country")
+    logger.info(f"Preloaded {len(locations)} distinct locations")
 
 
 def load_orders(csv_path):
@@ -149,62 +398,15 @@ def load_orders(csv_path):
     """
     df = pd.read_csv(csv_path)
     df = handle_missing_values(df)
-    dsn = get_db_dsn()
-
-    with psycopg2.connect(dsn) as conn:
+    with get_conn() as conn:
         with conn.cursor() as cur:
-            for _, row in df.iterrows():
-                # Step 1: Ensure location hierarchy exists
-
-                country_id = get_or_create_country(cur, row["ship_country"])
-                region_id = get_or_create_region(cur, row["ship_region"], country_id)
-                city_id = get_or_create_city(cur, row["ship_city"], region_id)
-
-                # Step 2: Insert into "orders"
-                # Convert pandas/numpy types to native Python types
-                def convert_value(val):
-                    """
-                    Convert pandas/NumPy scalar and missing values to native Python equivalents.
-
-                    Args:
-                        val: The input value (possibly a pandas/NumPy scalar or missing value) to normalize.
-
-                    Returns:
-                        The normalized value: `None` if `val` is missing, a native Python scalar if `val` is a NumPy scalar, or `val` unchanged otherwise.
-                    """
-                    if pd.isna(val):
-                        return None
-                    elif hasattr(val, 'item'):  # NumPy scalar
-                        return val.item()
-                    return val
-                    
-                cur.execute("""
-                    INSERT INTO orders (
-                        order_id,
-                        customer_id,
-                        employee_id,
-                        order_date,
-                        required_date,
-                        shipped_date,
-                        ship_via,
-                        freight,
-                        ship_name,
-                        ship_city_id,
-                        ship_postal_code
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    convert_value(row["order_id"]),
-                    convert_value(row["customer_id"]),
-                    convert_value(row["employee_id"]),
-                    convert_value(row["order_date"]),
-                    convert_value(row["required_date"]),
-                    convert_value(row["shipped_date"]),
-                    convert_value(row["ship_via"]),
-                    convert_value(row["freight"]),
-                    convert_value(row["ship_name"]),
-                    city_id,
-                    convert_value(row["ship_postal_code"])
-                ))
+            _relax_commit_durability(cur)
+
+            # Step 1: Ensure location hierarchy exists for every distinct ship location
+            df["ship_city_id"] = resolve_locations(cur, df, "ship_city", "ship_region", "ship_country")
+
+            # Step 2: Copy all orders in a single statement
+            bulk_copy(cur, "orders", df, ORDER_COLUMNS)
         conn.commit()
     print("Orders successfully loaded.")
 
@@ -217,7 +419,8 @@ def load_generic_csv(csv_path, table_name, city_col="city", region_col="region",
     Reads the CSV at `csv_path`, fills missing values, connects to the northwind schema, and inserts each row into `table_name`.
     If the CSV contains city/region/country columns (names provided by `city_col`, `region_col`, `country_col`), the function
     ensures corresponding country, region, and city records exist and adds the resulting city_id to inserts.
-    If `id_col` is provided, conflicts on that column are ignored (`ON CONFLICT (...) DO NOTHING`).
+    If `id_col` is provided, rows are inserted in multi-row batches and conflicts on that column are ignored
+    (`ON CONFLICT (...) DO NOTHING`); otherwise all rows are sent with a single COPY.
 
     Args:
         csv_path (str): Path to the input CSV file.
@@ -229,47 +432,28 @@ def load_generic_csv(csv_path, table_name, city_col="city", region_col="region",
     """
     df = pd.read_csv(csv_path)  
     df = handle_missing_values(df)
-    dsn = get_db_dsn()
-
-    with psycopg2.connect(dsn) as conn:
+    with get_conn() as conn:
         with conn.cursor() as cur:
-            for _, row in df.iterrows():
-                # Step 1: Resolve city hierarchy if columns exist
-                city_id = None
-                if city_col in df.columns and country_col in df.columns:
-                    country_id = get_or_create_country(cur, row[country_col])
-                    region_id = get_or_create_region(cur, row.get(region_col, ''), country_id)
-                    city_id = get_or_create_city(cur, row[city_col], region_id)
-
-                # Step 2: Prepare columns and values
-                columns = []
-                values = []
-                for col in df.columns:
-                    if col in [city_col, region_col, country_col]:
-                        continue  # Already handled
-                    columns.append(col)
-                    # Convert pandas/numpy types to native Python types
-                    value = row[col]
-                    if pd.isna(value):
-                        value = None
-                    elif hasattr(value, 'item'):  # NumPy scalar
-                        value = value.item()
-                    values.append(value)
-                
-                # Include city_id if present
-                if city_id is not None:
-                    columns.append("city_id")
-                    values.append(city_id)
-
-                # Step 3: Build INSERT query
-                cols_str = ",".join(columns)
-                placeholders = ",".join(["%s"] * len(values))
+            _relax_commit_durability(cur)
+
+            # Step 1: Resolve city hierarchy if columns exist
+            if city_col in df.columns and country_col in df.columns:
+                df["city_id"] = resolve_locations(cur, df, city_col, region_col, country_col)
 
-                query = f"INSERT INTO {table_name} ({cols_str}) VALUES ({placeholders})"
-                if id_col:
-                    query += f" ON CONFLICT ({id_col}) DO NOTHING"
+            columns = [col for col in df.columns if col not in [city_col, region_col, country_col]]
 
-                cur.execute(query, values)
+            # Step 2: Insert in batches so conflicts on id_col can be skipped
+            if id_col:
+                # Convert pandas/numpy types to native Python types, missing values to None
+                values = df[columns].astype(object)
+                rows = values.where(values.notna(), None).to_numpy().tolist()
+
+                cols_str = ",".join(columns)
+                query = f"INSERT INTO {table_name} ({cols_str}) VALUES %s ON CONFLICT ({id_col}) DO NOTHING"
+                execute_values(cur, query, rows, page_size=1000)
+            else:
+                # Step 3: Without conflict handling, copy all rows in a single statement
+                bulk_copy(cur, table_name, df, columns)
         conn.commit()
 
     print(f"Data from {csv_path} successfully loaded into {table_name}.")
@@ -288,9 +472,8 @@ if __name__ == '__main__':
     parser.add_argument('--excel', required=True, help='Path to northwind.xlsx (data/raw)')
     args = parser.parse_args()
 
-    # Load Excel sheets and save as CSVs
-    dfs = load_excel_sheets(args.excel)
-    save_csvs(dfs)
+    # Stream Excel sheets and save each as a CSV
+    save_csvs(iter_excel_sheets(args.excel))
 
     # List of configs for tables except Order and Order Detail
     csv_configs = [
@@ -335,29 +518,37 @@ if __name__ == '__main__':
         },
     ]
 
+    order_csv_path = "data/normalized/Order.csv"
+    order_detail_csv_path = "data/normalized/Order Detail.csv"
+
     # Make sure all required CSV files exist before loading
-    missing_files = [cfg["csv_path"] for cfg in csv_configs if not os.path.isfile(cfg["csv_path"])]
+    required_files = [cfg["csv_path"] for cfg in csv_configs] + [order_csv_path, order_detail_csv_path]
+    missing_files = [path for path in required_files if not os.path.isfile(path)]
     if missing_files:
         raise FileNotFoundError(f"Missing required CSV files: {missing_files}")
 
-    for config in csv_configs:
-        load_generic_csv(**config)
-
-    # Make sure Order.csv exists before loading orders
-    order_csv_path = "data/normalized/Order.csv"
-    if not os.path.isfile(order_csv_path):
-        raise FileNotFoundError(f"Missing required CSV file: {order_csv_path}")
+    # Create every location once, so the concurrent loads below only look them up
+    preload_locations(
+        [(cfg["csv_path"], cfg["city_col"], cfg["region_col"], cfg["country_col"])
+         for cfg in csv_configs if "city_col" in cfg]
+        + [(order_csv_path, "ship_city", "ship_region", "ship_country")]
+    )
+
+    # Tables within a wave have no foreign keys to each other and load concurrently on
+    # separate pooled connections; products reference suppliers and categories, so they wait
+    load_waves = [
+        [cfg for cfg in csv_configs if cfg["table_name"] != "products"],
+        [cfg for cfg in csv_configs if cfg["table_name"] == "products"],
+    ]
+    with ThreadPoolExecutor(max_workers=POOL_MAX_CONN) as executor:
+        for wave in load_waves:
+            list(executor.map(lambda cfg: load_generic_csv(**cfg), wave))
 
     # Load orders before order details to ensure referential integrity
     load_orders(order_csv_path)
 
-    # Make sure Order Detail.csv exists before loading order details
-    order_detail_csv_path = "data/normalized/Order Detail.csv"
-    if not os.path.isfile(order_detail_csv_path):
-        raise FileNotFoundError(f"Missing required CSV file: {order_detail_csv_path}")
-
     order_detail_config = {
         "csv_path": order_detail_csv_path,
         "table_name": "order_details",
     }
-    load_generic_csv(**order_detail_config)
\ No newline at end of file
+    load_generic_csv(**order_detail_config)
@@ -0,0 +1,89 @@
+"""
+Shared PostgreSQL connection pool.
+
+Connections are opened on first use and handed back to the pool afterwards, so a run
+that loads several tables pays the connection handshake once instead of once per table.
+"""
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.config import get_db_dsn
+
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Create the process-wide connection pool on first call and return it afterwards.
+
+    Creation happens under a lock, so threads racing on the first call (e.g. API requests
+    arriving at startup) share a single pool instead of each opening their own.
+
+    Returns:
+        ThreadedConnectionPool: Pool of connections to the configured database.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, dsn=get_db_dsn())
+    return _pool
+
+
+@contextmanager
+def get_conn():
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+
+    Like `with psycopg2.connect(dsn) as conn:`, the transaction is committed when the block
+    exits normally and rolled back on error; the connection is then returned to the pool.
+
+    Yields:
+        psycopg2.extensions.connection: An open database connection.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+
+@contextmanager
+def get_readonly_conn():
+    """
+    Borrow a pooled connection for a single read-only transaction.
+
+    Meant for untrusted (generated) queries: the transaction is READ ONLY and is always rolled
+    back, and the session is reset (`DISCARD ALL`) before the connection goes back to the pool,
+    so settings changed through `set_config()` or advisory locks taken by one query cannot leak
+    into later queries. A connection that cannot be reset is closed instead of being reused.
+    Only single statements stay read-only (as QueryValidator enforces): a `COMMIT` inside a
+    multi-statement string would end the transaction and run the rest outside it.
+
+    Yields:
+        psycopg2.extensions.connection: An open database connection inside a read-only
+            transaction.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET TRANSACTION READ ONLY")
+        yield conn
+    finally:
+        try:
+            conn.rollback()
+            conn.reset()
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+        else:
+            pool.putconn(conn)
@@ -1,22 +1,23 @@
 import sys
 import os
 import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field
-from google import genai
-from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from src.config import TRUSTED_PROXIES
+from src.db import POOL_MAX_CONN
 from src.query_validator import QueryValidator
-from src.text2sql_engine import generate_sql_query, sanitize_sql
+from src.text2sql_engine import aclose_client, generate_sql_query_async, sanitize_sql
 from src.utils import build_prompt, df_to_json, execute_query_on_db
 
-load_dotenv()
-
-
-client = genai.Client()
+logger = logging.getLogger(__name__)
 
 
 # Request and Response Model for generate-sql endpoint
@@ -32,54 +33,153 @@ class Text2SQLRequest(BaseModel):
     )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the shared Gemini client's connections when the server shuts down."""
+    yield
+    await aclose_client()
+
+
 app = FastAPI(
     title="Text2SQL API (Gemini + Northwind)",
     version="1.0.0",
-    description="Convert natural language questions to SQL queries and execute them safely."
+    description="Convert natural language questions to SQL queries and execute them safely.",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Middlewares
-# Auth Middleware
-@app.middleware
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    print(f"Request to {request.url.path} took {process_time} time")
+# Health checks skip timing and rate limiting entirely
+UNMETERED_PATHS = frozenset({"/"})
+
+# Process Time Middleware
+class ProcessTimeMiddleware:
+    """
+    Pure ASGI middleware that adds an `X-Process-Time` header to HTTP responses, except for
+    paths in `UNMETERED_PATHS`.
+
+    The header is injected into the `http.response.start` message as it is sent, so the
+    response body is streamed through untouched instead of being buffered by Starlette's
+    BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNMETERED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-    return response
+        start_time = time.perf_counter()
+
+        async def send_with_process_time(message):
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start_time
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", str(process_time).encode()))
+                message["headers"] = headers
+                logger.debug("Request to %s took %s time", scope["path"], process_time)
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
+
+app.add_middleware(ProcessTimeMiddleware)
 
 # Rate Limiting Middleware
-requests = {}
+# Client IP -> deque of request times, least recently seen client first
+requests = OrderedDict()
 
 RATE_LIMIT = 5 # requests
 RATE_TIME = 10 # seconds
+MAX_TRACKED_CLIENTS = 100_000
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware that allows at most `RATE_LIMIT` requests per client IP every `RATE_TIME` seconds.
+    Paths in `UNMETERED_PATHS` are not counted.
+
+    The client address is read straight from the ASGI scope (see `client_ip`), and rejected
+    requests are answered with a prebuilt 429 response without reaching the application. The
+    store is kept in least-recently-seen order: it never tracks more than `MAX_TRACKED_CLIENTS`
+    addresses, and idle clients are swept off its front at most once every `RATE_TIME` seconds.
+    """
+
+    too_many_requests = JSONResponse(
+        status_code=429,
+        content={"message": "Too many requests"}
+    )
 
-@app.middleware("http")
-async def rate_limit(request: Request, call_next):
-    client_ip = request.client.host
-
-    if client_ip in requests:
-        if len(requests[client_ip]) >= RATE_LIMIT:
-            # Remove old requests
-            current_time = time.time()
-            requests[client_ip] = [
-                req_time for req_time in requests[client_ip]
-                if current_time - req_time < RATE_TIME
-            ]
-            if len(requests[client_ip]) >= RATE_LIMIT:
-                return JSONResponse(
-                    status_code=429,
-                    content={"message": "Too many requests"}
-                )
-    else:
-        requests[client_ip] = []
-
-    requests[client_ip].append(time.time())
-
-    response = await call_next(request)
-    return response
+    def __init__(self, app):
+        self.app = app
+        self.last_sweep = time.monotonic()
+
+    def sweep_idle_clients(self, now):
+        """Forget the least recently seen clients until one has a request within the last `RATE_TIME` seconds."""
+        while requests:
+            window = next(iter(requests.values()))
+            if window and now - window[-1] < RATE_TIME:
+                break
+            requests.popitem(last=False)
+        self.last_sweep = now
+
+    def client_ip(self, scope):
+        """
+        Return the address to rate limit for an HTTP scope.
+
+        Requests arriving from a proxy in `TRUSTED_PROXIES` are attributed to the nearest untrusted
+        hop in their `X-Forwarded-For` header, scanned right to left so a client cannot spoof its
+        address by prepending entries. Repeated header lines are joined in order first, since some
+        proxies (e.g. HAProxy) add their own line instead of appending to the client's. Any other
+        peer is used as-is.
+        """
+        peer = scope["client"][0]
+        if peer in TRUSTED_PROXIES:
+            forwarded_for = b",".join(value for name, value in scope["headers"] if name == b"x-forwarded-for")
+            for hop in reversed(forwarded_for.decode("latin-1").split(",")):
+                hop = hop.strip()
+                if hop and hop not in TRUSTED_PROXIES:
+                    return hop
+        return peer
+
+    def client_window(self, client_ip):
+        """Return the request-time window for `client_ip`, evicting the least recently seen client when full."""
+        window = requests.get(client_ip)
+        if window is None:
+            if len(requests) >= MAX_TRACKED_CLIENTS:
+                requests.popitem(last=False)
+            window = requests[client_ip] = deque()
+        else:
+            requests.move_to_end(client_ip)
+        return window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNMETERED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = self.client_ip(scope)
+
+        now = time.monotonic()
+        if now - self.last_sweep >= RATE_TIME:
+            self.sweep_idle_clients(now)
+
+        # Drop timestamps that have left the sliding window
+        window = self.client_window(client_ip)
+        while window and now - window[0] >= RATE_TIME:
+            window.popleft()
+
+        if len(window) >= RATE_LIMIT:
+            await self.too_many_requests(scope, receive, send)
+            return
+
+        window.append(now)
+
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(RateLimitMiddleware)
 
 # Custom Exception class
 class CustomException(Exception):
@@ -102,13 +202,22 @@ def root():
     return {"status": "ok", "message": "Text2SQL API running."}
 
 
+# At most one query per pooled connection; more would exhaust the pool instead of waiting
+db_slots = asyncio.Semaphore(POOL_MAX_CONN)
+
+
 @app.post("/generate-sql", response_model=SQLResponseModel)
-def generate_and_execute_sql(request: Text2SQLRequest):
-    """Generate, validate, and execute SQL query from English question."""
+async def generate_and_execute_sql(request: Text2SQLRequest):
+    """
+    Generate, validate, and execute SQL query from English question.
+
+    Gemini is awaited through its async client and the blocking database call runs in a worker
+    thread, so a slow model or query does not hold the event loop.
+    """
     try:
         prompt = build_prompt(request.question)
         # Generate SQL using Gemini
-        raw_sql = generate_sql_query(prompt)
+        raw_sql = await generate_sql_query_async(prompt)
         sanitized_sql = sanitize_sql(raw_sql)
 
         if not sanitized_sql:
@@ -117,7 +226,8 @@ def generate_and_execute_sql(request: Text2SQLRequest):
         # Validate the SQL
         validated_sql = QueryValidator.validate(sanitized_sql)
 
-        df = execute_query_on_db(validated_sql)
+        async with db_slots:
+            df = await asyncio.to_thread(execute_query_on_db, validated_sql)
 
         return SQLResponseModel(
             sql_query=raw_sql,
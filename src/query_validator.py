@@ -1,20 +1,40 @@
 import re
 
+_LIMIT_RE = re.compile(r'\blimit\b', re.IGNORECASE)
+_TRAILING_SEMICOLON_RE = re.compile(r';\s*$')
+
+
+def _has_limit(query: str) -> bool:
+    """
+    Return True if `query` contains LIMIT as a whole word, case-insensitively.
+
+    ASCII queries without the substring "limit" are rejected with a plain string search; the
+    regex only runs when it could match. Non-ASCII queries always use the regex, since characters
+    such as "ı" match "i" case-insensitively without lowercasing to it.
+    """
+    if query.isascii() and "limit" not in query.lower():
+        return False
+    return _LIMIT_RE.search(query) is not None
+
+
 class QueryValidator:
     """Validator for SQL queries to ensure safety and enforce limits."""
 
     DANGEROUS_KEYWORDS = [
-        r"\bINSERT\b",
-        r"\bUPDATE\b",
-        r"\bDELETE\b",
-        r"\bDROP\b",
-        r"\bALTER\b",
-        r"\bTRUNCATE\b",
-        r"\bCREATE\b",
-        r"\bGRANT\b",
-        r"\bREVOKE\b"
+        "INSERT",
+        "UPDATE",
+        "DELETE",
+        "DROP",
+        "ALTER",
+        "TRUNCATE",
+        "CREATE",
+        "GRANT",
+        "REVOKE"
     ]
 
+    # All keywords in one alternation, so a query is scanned once instead of once per keyword
+    DANGEROUS_RE = re.compile(r"\b(" + "|".join(DANGEROUS_KEYWORDS) + r")\b", re.IGNORECASE)
+
     @staticmethod
     def validate(query: str) -> str:
         """
@@ -22,6 +42,7 @@ class QueryValidator:
 
         1. Allow only SELECT statements.
         2. Reject dangerous keywords.
+        3. Reject more than one statement, i.e. a ';' anywhere but at the end.
         
         Args:
             query (str): SQL query to validate.
@@ -37,14 +58,18 @@ class QueryValidator:
             raise ValueError("Only SELECT statements are allowed.")
 
         # Check for dangerous keywords
-        for kw in QueryValidator.DANGEROUS_KEYWORDS:
-            if re.search(kw, query, re.IGNORECASE):
-                raise ValueError(f"Dangerous keyword detected: {kw}")
+        match = QueryValidator.DANGEROUS_RE.search(query)
+        if match:
+            raise ValueError(f"Dangerous keyword detected: {match.group(1).upper()}")
+
+        # A second statement (e.g. after COMMIT) would run outside the caller's transaction
+        if ";" in _TRAILING_SEMICOLON_RE.sub('', query):
+            raise ValueError("Only a single SQL statement is allowed.")
 
         # Ensure LIMIT is present and appended before any trailing semicolon
-        if not re.search(r'\blimit\b', query, re.IGNORECASE):
+        if not _has_limit(query):
             # Remove any trailing semicolon and whitespace
-            query = re.sub(r';\s*$', '', query)
+            query = _TRAILING_SEMICOLON_RE.sub('', query)
             query += " LIMIT 1000;"
         
 
@@ -1,6 +1,7 @@
-import re
 import os
 import sys
+import hashlib
+from collections import OrderedDict
 from google import genai
 from dotenv import load_dotenv
 
@@ -11,31 +12,105 @@ from src.utils import build_prompt, df_to_json, execute_query_on_db
 
 load_dotenv()
 
+# Shared by every caller in the process, including the API; see aclose_client()
 client = genai.Client()
 
+# Most recently used generations, keyed by a digest of the prompt
+GENERATION_CACHE_SIZE = 256
+generation_cache = OrderedDict()
+
+
+def _prompt_key(prompt: str) -> bytes:
+    """Return a compact, fixed-size cache key for a (large) prompt."""
+    return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+
+def _cached_generation(key: bytes):
+    """Return the cached SQL for `key` and mark it as recently used, or None on a miss."""
+    sql = generation_cache.get(key)
+    if sql is not None:
+        generation_cache.move_to_end(key)
+    return sql
+
+
+def _remember_generation(key: bytes, sql: str) -> None:
+    """
+    Cache a generation that passes validation, evicting the least recently used entry when full.
+
+    SQL that is empty after sanitization or rejected by QueryValidator is not cached, so asking the
+    same question again goes back to the model instead of replaying the bad query.
+    """
+    sanitized = sanitize_sql(sql)
+    if not sanitized:
+        return
+    try:
+        QueryValidator.validate(sanitized)
+    except ValueError:
+        return
+    generation_cache[key] = sql
+    generation_cache.move_to_end(key)
+    if len(generation_cache) > GENERATION_CACHE_SIZE:
+        generation_cache.popitem(last=False)
+
 
 def generate_sql_query(prompt: str) -> str:
-    """Generate SQL query from an English prompt using the Gemini API."""
+    """
+    Generate SQL query from an English prompt using the Gemini API.
+
+    Generations that pass validation are cached per prompt, so repeated questions skip the API call.
+    """
+    key = _prompt_key(prompt)
+    cached = _cached_generation(key)
+    if cached is not None:
+        return cached
     try:
         response = client.models.generate_content(
             model="gemini-2.5-flash", contents=prompt
         )
-        return response.text.strip()
+        sql = response.text.strip()
+        _remember_generation(key, sql)
+        return sql
     except Exception as e:
         print(f"Error generating SQL: {e}")
         return ""
 
 
+async def generate_sql_query_async(prompt: str) -> str:
+    """Generate SQL query from an English prompt using the async Gemini API, sharing the generation cache."""
+    key = _prompt_key(prompt)
+    cached = _cached_generation(key)
+    if cached is not None:
+        return cached
+    try:
+        response = await client.aio.models.generate_content(
+            model="gemini-2.5-flash", contents=prompt
+        )
+        sql = response.text.strip()
+        _remember_generation(key, sql)
+        return sql
+    except Exception as e:
+        print(f"Error generating SQL: {e}")
+        return ""
+
+
+async def aclose_client() -> None:
+    """Close the shared Gemini client's sync and async HTTP connection pools."""
+    await client.aio.aclose()
+    client.close()
+
+
 def sanitize_sql(sql: str) -> str:
     """Sanitize the generated SQL query."""
     # Remove non-ASCII characters
-    sql = re.sub(r'[^\x00-\x7F]+', '', sql)
+    sql = sql.encode('ascii', 'ignore').decode('ascii')
     # Strip leading/trailing whitespace
     sql = sql.strip()
     # extract the text from ```sql ...``` block if present
-    match = re.search(r"```sql\s*(.*?)\s*```", sql, re.DOTALL | re.IGNORECASE)
-    if match:
-        sql = match.group(1)
+    start = sql.lower().find("```sql")
+    if start != -1:
+        end = sql.find("```", start + 6)
+        if end != -1:
+            sql = sql[start + 6:end].strip()
 
     return sql
 
@@ -1,15 +1,14 @@
 # # =========================================================
 # # Helper Functions
 # # =========================================================
-import os
-import sys
-import psycopg2
+import re
 import pandas as pd
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from src.config import get_db_dsn
+from src.db import get_readonly_conn
 
+# camelCase / PascalCase word boundaries, compiled once at import: before a capitalized
+# word, or between a lowercase letter/digit and an uppercase letter
+_SNAKE_BOUNDARY_RE = re.compile(r'(?<=.)(?=[A-Z][a-z])|(?<=[a-z0-9])(?=[A-Z])')
 
 def to_snake_case(s):
     """
@@ -27,20 +26,45 @@ def to_snake_case(s):
     Returns:
         str: The snake_case version of the input string.
     """
-    import re
     s = str(s).strip()
     # Remove spaces
     s = s.replace(' ', '')
     # Convert camelCase or PascalCase to snake_case
-    s = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', s)
-    s = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s)
+    s = _SNAKE_BOUNDARY_RE.sub('_', s)
 
     return s.lower()
 
+
+def to_snake_case_index(labels):
+    """
+    Convert a sequence of labels to snake_case in one vectorized pass.
+
+    Applies the same rules as `to_snake_case`, but runs each step once over the whole
+    index with pandas string methods instead of calling the function per label.
+
+    Args:
+        labels (Iterable): Labels to convert, e.g. `df.columns`.
+
+    Returns:
+        pd.Index: The snake_case labels, in the same order.
+    """
+    return (
+        pd.Index(labels).astype(str)
+        .str.strip()
+        .str.replace(' ', '', regex=False)
+        .str.replace(_SNAKE_BOUNDARY_RE, '_', regex=True)
+        .str.lower()
+    )
+
 def get_or_create_country(cur, country_name):
     """
     Get the country_id for a given country_name, or create it if it does not exist.
 
+    The lookup and the insert are a single statement, so either case costs one round trip. The
+    insert is attempted even for an existing name, so every call uses up a SERIAL value and ids
+    can have gaps. If a concurrent transaction commits the same name while the statement waits,
+    neither half sees it; the id is then read with a second, plain lookup.
+
     Args:
         cur: psycopg2 cursor.
         country_name (str): Name of the country.
@@ -48,22 +72,32 @@ def get_or_create_country(cur, country_name):
     Returns:
         int: country_id
     """
-    cur.execute("SELECT country_id FROM countries WHERE country_name = %s", (country_name,))
-    result = cur.fetchone()
-    if result:
-        return result[0]
-
     cur.execute("""
-        INSERT INTO countries (country_name) VALUES (%s)
-        RETURNING country_id
-    """, (country_name,))
-    return cur.fetchone()[0]
+        WITH inserted AS (
+            INSERT INTO countries (country_name) VALUES (%s)
+            ON CONFLICT (country_name) DO NOTHING
+            RETURNING country_id
+        )
+        SELECT country_id FROM inserted
+        UNION ALL
+        SELECT country_id FROM countries WHERE country_name = %s
+    """, (country_name, country_name))
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("SELECT country_id FROM countries WHERE country_name = %s", (country_name,))
+        row = cur.fetchone()
+    return row[0]
 
 
 def get_or_create_region(cur, region_name, country_id):
     """
     Retrieve the ID for a region with the given name and country, inserting a new region if none exists.
-    
+
+    The lookup and the insert are a single statement, so either case costs one round trip. The
+    insert is attempted even for an existing name, so every call uses up a SERIAL value and ids
+    can have gaps. If a concurrent transaction commits the same name while the statement waits,
+    neither half sees it; the id is then read with a second, plain lookup.
+
     Parameters:
         cur: Database cursor used to execute queries.
         region_name (str): Name of the region; empty or falsy values are treated as "Unknown".
@@ -76,25 +110,34 @@ def get_or_create_region(cur, region_name, country_id):
         region_name = "Unknown"
 
     cur.execute("""
-        SELECT region_id FROM regions
-        WHERE region_name = %s AND country_id = %s
-    """, (region_name, country_id))
-    result = cur.fetchone()
-    if result:
-        return result[0]
-
-    cur.execute("""
-        INSERT INTO regions (region_name, country_id)
-        VALUES (%s, %s)
-        RETURNING region_id
-    """, (region_name, country_id))
-    return cur.fetchone()[0]
+        WITH inserted AS (
+            INSERT INTO regions (region_name, country_id) VALUES (%s, %s)
+            ON CONFLICT (region_name, country_id) DO NOTHING
+            RETURNING region_id
+        )
+        SELECT region_id FROM inserted
+        UNION ALL
+        SELECT region_id FROM regions WHERE region_name = %s AND country_id = %s
+    """, (region_name, country_id, region_name, country_id))
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(
+            "SELECT region_id FROM regions WHERE region_name = %s AND country_id = %s",
+            (region_name, country_id),
+        )
+        row = cur.fetchone()
+    return row[0]
 
 
 def get_or_create_city(cur, city_name, region_id):
     """
     Get the city_id for a given city_name and region_id, or create it if it does not exist.
 
+    The lookup and the insert are a single statement, so either case costs one round trip. The
+    insert is attempted even for an existing name, so every call uses up a SERIAL value and ids
+    can have gaps. If a concurrent transaction commits the same name while the statement waits,
+    neither half sees it; the id is then read with a second, plain lookup.
+
     Args:
         cur: psycopg2 cursor.
         city_name (str): Name of the city.
@@ -104,28 +147,36 @@ def get_or_create_city(cur, city_name, region_id):
         int: city_id
     """
     cur.execute("""
+        WITH inserted AS (
+            INSERT INTO cities (city_name, region_id) VALUES (%s, %s)
+            ON CONFLICT (city_name, region_id) DO NOTHING
+            RETURNING city_id
+        )
+        SELECT city_id FROM inserted
+        UNION ALL
         SELECT city_id FROM cities WHERE city_name = %s AND region_id = %s
-    """, (city_name, region_id))
-    result = cur.fetchone()
-    if result:
-        return result[0]
-
-    cur.execute("""
-        INSERT INTO cities (city_name, region_id)
-        VALUES (%s, %s)
-        RETURNING city_id
-    """, (city_name, region_id))
-    return cur.fetchone()[0]
+    """, (city_name, region_id, city_name, region_id))
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(
+            "SELECT city_id FROM cities WHERE city_name = %s AND region_id = %s",
+            (city_name, region_id),
+        )
+        row = cur.fetchone()
+    return row[0]
 
 
 def execute_query_on_db(query: str) -> pd.DataFrame:
     """
     Execute validated SQL query on the PostgreSQL Northwind database.
     Returns results as a pandas DataFrame.
+
+    The connection is borrowed from the shared pool in `src.db`, so repeated queries skip the
+    connection handshake. The query runs in a read-only transaction that is rolled back and the
+    session is reset afterwards, so nothing it changes carries over to the next query.
     """
-    dsn = get_db_dsn()
     try:
-        with psycopg2.connect(dsn) as conn:
+        with get_readonly_conn() as conn:
             df = pd.read_sql_query(query, conn)
         return df
     except Exception as e:
@@ -1,8 +1,9 @@
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 class MockGeminiClient:
     """
-    A mock Gemini API client that simulates `client.models.generate_content`.
+    A mock Gemini API client that simulates `client.models.generate_content` and its async
+    counterpart `client.aio.models.generate_content`.
     """
 
     def __init__(self, fake_response_text="SELECT * FROM cities;"):
@@ -10,7 +11,7 @@ class MockGeminiClient:
         """
         Initialize the mock Gemini client with a configurable fake response text.
         
-        Creates `self.fake_response` (a Mock whose `.text` is set to `fake_response_text`) and `self.models` (a Mock) where `self.models.generate_content` returns the `fake_response`.
+        Creates `self.fake_response` (a Mock whose `.text` is set to `fake_response_text`), `self.models` (a Mock) where `self.models.generate_content` returns the `fake_response`, and `self.aio` (a Mock) where the awaitable `self.aio.models.generate_content` returns it too.
         
         Parameters:
             fake_response_text (str): Initial value for the mock response's `.text`. Defaults to "SELECT * FROM cities;".
@@ -22,6 +23,10 @@ class MockGeminiClient:
         self.models = Mock()
         self.models.generate_content = Mock(return_value=self.fake_response)
 
+        # Mock the async client exposed as `client.aio`
+        self.aio = Mock()
+        self.aio.models.generate_content = AsyncMock(return_value=self.fake_response)
+
     def set_response(self, text):
         """
         Update the mock response text and ensure future generate_content calls return it.
@@ -31,12 +36,14 @@ class MockGeminiClient:
         """
         self.fake_response.text = text
         self.models.generate_content.return_value = self.fake_response
+        self.aio.models.generate_content.return_value = self.fake_response
 
     def set_exception(self, exception):
         """
-        Configure the mock so `models.generate_content` raises the given exception when called.
+        Configure the mock so `models.generate_content` and `aio.models.generate_content` raise the given exception when called.
         
         Parameters:
-            exception (Exception or callable): The exception instance or callable to be used as `side_effect` for `models.generate_content`.
+            exception (Exception or callable): The exception instance or callable to be used as `side_effect` for both `generate_content` mocks.
         """
-        self.models.generate_content.side_effect = exception
\ No newline at end of file
+        self.models.generate_content.side_effect = exception
+        self.aio.models.generate_content.side_effect = exception
\ No newline at end of file
@@ -3,7 +3,7 @@ from pathlib import Path
 import psycopg2
 import pandas as pd
 import pytest
-from src.data_loader import clean_columns, load_excel_sheets
+from src.data_loader import clean_columns, handle_missing_values, load_excel_sheets
 from tests.conftest import db_dsn
 
 @pytest.fixture(scope="session")
@@ -45,3 +45,11 @@ def test_clean_columns():
     clean_df = clean_columns(df)
     expected_cols = ["first_name", "last_name", "age"]
     assert list(clean_df.columns) == expected_cols
+
+def test_handle_missing_values():
+    """Check that only columns with gaps are filled, by column type."""
+    df = pd.DataFrame({"qty": [1.0, None], "name": ["a", None], "code": ["x", "y"]})
+    filled = handle_missing_values(df)
+    assert filled["qty"].tolist() == [1.0, 0.0]
+    assert filled["name"].tolist() == ["a", ""]
+    assert filled["code"].tolist() == ["x", "y"]
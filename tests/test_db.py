@@ -0,0 +1,98 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import psycopg2
+import pytest
+
+from src import db
+
+
+def test_get_conn_returns_connection_to_pool(monkeypatch):
+    mock_pool = MagicMock()
+    mock_conn = mock_pool.getconn.return_value
+    monkeypatch.setattr(db, "get_pool", lambda: mock_pool)
+
+    with db.get_conn() as conn:
+        assert conn is mock_conn
+
+    mock_pool.putconn.assert_called_once_with(mock_conn)
+
+
+def test_get_conn_returns_connection_to_pool_on_error(monkeypatch):
+    mock_pool = MagicMock()
+    mock_conn = mock_pool.getconn.return_value
+    monkeypatch.setattr(db, "get_pool", lambda: mock_pool)
+
+    with pytest.raises(RuntimeError):
+        with db.get_conn():
+            raise RuntimeError("query failed")
+
+    mock_pool.putconn.assert_called_once_with(mock_conn)
+
+
+def test_get_readonly_conn_rolls_back_and_resets(monkeypatch):
+    mock_pool = MagicMock()
+    mock_conn = mock_pool.getconn.return_value
+    mock_cur = mock_conn.cursor.return_value.__enter__.return_value
+    monkeypatch.setattr(db, "get_pool", lambda: mock_pool)
+
+    with db.get_readonly_conn() as conn:
+        assert conn is mock_conn
+
+    mock_cur.execute.assert_called_once_with("SET TRANSACTION READ ONLY")
+    mock_conn.commit.assert_not_called()
+    mock_conn.rollback.assert_called_once_with()
+    mock_conn.reset.assert_called_once_with()
+    mock_pool.putconn.assert_called_once_with(mock_conn)
+
+
+def test_get_readonly_conn_rolls_back_and_resets_on_error(monkeypatch):
+    mock_pool = MagicMock()
+    mock_conn = mock_pool.getconn.return_value
+    monkeypatch.setattr(db, "get_pool", lambda: mock_pool)
+
+    with pytest.raises(RuntimeError):
+        with db.get_readonly_conn():
+            raise RuntimeError("query failed")
+
+    mock_conn.rollback.assert_called_once_with()
+    mock_conn.reset.assert_called_once_with()
+    mock_pool.putconn.assert_called_once_with(mock_conn)
+
+
+def test_get_readonly_conn_closes_connection_that_cannot_be_reset(monkeypatch):
+    mock_pool = MagicMock()
+    mock_conn = mock_pool.getconn.return_value
+    mock_conn.reset.side_effect = psycopg2.OperationalError("server closed the connection")
+    monkeypatch.setattr(db, "get_pool", lambda: mock_pool)
+
+    with db.get_readonly_conn():
+        pass
+
+    mock_pool.putconn.assert_called_once_with(mock_conn, close=True)
+
+
+def test_get_pool_creates_one_pool_across_threads(monkeypatch):
+    created = []
+    start = threading.Barrier(8)
+
+    def slow_pool(*args, **kwargs):
+        time.sleep(0.05)  # widen the window in which other threads could race past the check
+        pool = MagicMock()
+        created.append(pool)
+        return pool
+
+    monkeypatch.setattr(db, "_pool", None)
+    monkeypatch.setattr(db, "ThreadedConnectionPool", slow_pool)
+    monkeypatch.setattr(db, "get_db_dsn", lambda: "dbname=test")
+
+    def borrow_pool():
+        start.wait()
+        return db.get_pool()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pools = list(executor.map(lambda _: borrow_pool(), range(8)))
+
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)
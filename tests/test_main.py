@@ -0,0 +1,115 @@
+from unittest.mock import AsyncMock, Mock
+
+import pandas as pd
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+
+
+@pytest.fixture
+def client():
+    """Provide a TestClient with a fresh rate-limit window."""
+    main.requests.clear()
+    return TestClient(main.app)
+
+
+def test_process_time_header(client):
+    """Metered HTTP responses carry the X-Process-Time header."""
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+
+def test_health_check_is_unmetered(client):
+    """The health check is neither timed nor rate limited."""
+    for _ in range(main.RATE_LIMIT + 1):
+        response = client.get("/")
+        assert response.status_code == 200
+    assert "X-Process-Time" not in response.headers
+    assert not main.requests
+
+
+def test_rate_limit(client):
+    """Requests beyond RATE_LIMIT within RATE_TIME are rejected with 429."""
+    for _ in range(main.RATE_LIMIT):
+        assert client.get("/openapi.json").status_code == 200
+
+    response = client.get("/openapi.json")
+    assert response.status_code == 429
+    assert response.json() == {"message": "Too many requests"}
+
+
+def test_rate_limit_sweeps_idle_clients():
+    """Clients with no request inside the window are dropped from the store."""
+    main.requests.clear()
+    limiter = main.RateLimitMiddleware(main.app)
+    limiter.client_window("10.0.0.1").append(0.0)
+    limiter.client_window("10.0.0.2").append(main.RATE_TIME * 2)
+
+    limiter.sweep_idle_clients(now=main.RATE_TIME * 2 + 1)
+
+    assert list(main.requests) == ["10.0.0.2"]
+
+
+def test_rate_limit_store_is_bounded(monkeypatch):
+    """The least recently seen client is evicted once MAX_TRACKED_CLIENTS is reached."""
+    main.requests.clear()
+    monkeypatch.setattr(main, "MAX_TRACKED_CLIENTS", 2)
+    limiter = main.RateLimitMiddleware(main.app)
+
+    limiter.client_window("10.0.0.1")
+    limiter.client_window("10.0.0.2")
+    limiter.client_window("10.0.0.1")
+    limiter.client_window("10.0.0.3")
+
+    assert list(main.requests) == ["10.0.0.1", "10.0.0.3"]
+
+
+def test_lifespan_closes_gemini_client(monkeypatch):
+    """The shared Gemini client is closed when the app shuts down."""
+    gemini_client = Mock()
+    gemini_client.aio.aclose = AsyncMock()
+    monkeypatch.setattr("src.text2sql_engine.client", gemini_client)
+
+    with TestClient(main.app):
+        gemini_client.close.assert_not_called()
+
+    gemini_client.aio.aclose.assert_awaited_once_with()
+    gemini_client.close.assert_called_once_with()
+
+
+def test_generate_sql_endpoint(client, monkeypatch):
+    """The endpoint awaits Gemini, validates the SQL and returns the query results."""
+    monkeypatch.setattr(main, "generate_sql_query_async", AsyncMock(return_value="```sql\nSELECT * FROM cities\n```"))
+    monkeypatch.setattr(main, "execute_query_on_db", Mock(return_value=pd.DataFrame({"city_name": ["Berlin"]})))
+
+    response = client.post("/generate-sql", json={"question": "List cities"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sanitized_query"] == "SELECT * FROM cities"
+    assert body["validate_query"] == "SELECT * FROM cities LIMIT 1000;"
+    main.execute_query_on_db.assert_called_once_with("SELECT * FROM cities LIMIT 1000;")
+
+
+@pytest.mark.parametrize("peer, forwarded_for, expected", [
+    ("203.0.113.7", b"198.51.100.1", "203.0.113.7"),
+    ("10.0.0.9", b"198.51.100.1", "198.51.100.1"),
+    ("10.0.0.9", b"6.6.6.6, 198.51.100.1, 10.0.0.8", "198.51.100.1"),
+    ("10.0.0.9", None, "10.0.0.9"),
+    # A proxy that adds its own header line after the one the client sent
+    ("10.0.0.9", [b"6.6.6.6", b"198.51.100.1"], "198.51.100.1"),
+])
+def test_rate_limit_client_ip(monkeypatch, peer, forwarded_for, expected):
+    """X-Forwarded-For is honoured only from trusted proxies, using the nearest untrusted hop."""
+    monkeypatch.setattr(main, "TRUSTED_PROXIES", frozenset({"10.0.0.8", "10.0.0.9"}))
+    headers = [(b"host", b"api")]
+    if isinstance(forwarded_for, bytes):
+        forwarded_for = [forwarded_for]
+    for value in forwarded_for or ():
+        headers.append((b"x-forwarded-for", value))
+    scope = {"type": "http", "client": (peer, 50000), "headers": headers}
+
+    assert main.RateLimitMiddleware(main.app).client_ip(scope) == expected
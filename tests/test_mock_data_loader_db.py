@@ -0,0 +1,227 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock, Mock
+import pandas as pd
+
+from src.data_loader import _get_or_insert_ids, _lookup_ids, bulk_copy, preload_locations, resolve_locations, save_csvs
+
+
+def fake_get_or_insert_ids(calls):
+    """Return a stand-in for _get_or_insert_ids that records its keys and hands out ids per table."""
+    base_ids = {"countries": 100, "regions": 200, "cities": 300}
+
+    def get_or_insert_ids(cur, table, key_cols, id_col, keys):
+        calls.append((table, key_cols, id_col, keys))
+        rows = [(*key, base_ids[table] + i) for i, key in enumerate(sorted(keys, key=str))]
+        # The database gives no ordering guarantee, so hand the rows back reversed
+        return rows[::-1]
+
+    return get_or_insert_ids
+
+
+def fake_lookup_ids(existing, calls=None):
+    """Return a stand-in for _lookup_ids that finds only the keys in `existing` ({(table, key): id})."""
+    def lookup_ids(cur, table, key_cols, id_col, keys):
+        if calls is not None:
+            calls.append((table, keys))
+        return [(*key, existing[table, tuple(key)]) for key in keys if (table, tuple(key)) in existing]
+
+    return lookup_ids
+
+# ------------------------
+# Tests for bulk_copy
+# ------------------------
+def test_bulk_copy_statement_and_nulls():
+    mock_cur = Mock()
+    df = pd.DataFrame({"category_id": [1, 2], "description": ["Drinks", None], "unused": ["x", "y"]})
+
+    bulk_copy(mock_cur, "categories", df, ["category_id", "description"])
+
+    query, buf = mock_cur.copy_expert.call_args.args
+    assert query == "COPY categories (category_id,description) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+    assert buf.getvalue() == "1,Drinks\n2,\\N\n"
+
+
+def test_bulk_copy_writes_whole_floats_as_integers():
+    mock_cur = Mock()
+    # Integer columns that had gaps are read back as float64
+    df = pd.DataFrame({"employee_id": [1.0, 5.0, 0.0], "freight": [32.38, 11.0, 0.0]})
+
+    bulk_copy(mock_cur, "orders", df, ["employee_id", "freight"])
+
+    buf = mock_cur.copy_expert.call_args.args[1]
+    assert buf.getvalue() == "1,32.38\n5,11.0\n0,0.0\n"
+    # The caller's frame is left untouched
+    assert df["employee_id"].dtype == "float64"
+
+# ------------------------
+# Tests for _get_or_insert_ids
+# ------------------------
+def test_get_or_insert_ids_single_statement(monkeypatch):
+    mock_cur = Mock()
+    mock_execute_values = Mock(return_value=[("Berlin", 10, 7)])
+    monkeypatch.setattr("src.data_loader.execute_values", mock_execute_values)
+
+    rows = _get_or_insert_ids(mock_cur, "cities", ["city_name", "region_id"], "city_id", [["Berlin", 10]])
+
+    assert rows == [("Berlin", 10, 7)]
+    cur, query, keys = mock_execute_values.call_args.args
+    assert cur is mock_cur
+    assert keys == [["Berlin", 10]]
+    # All keys go in one statement, whatever their number
+    assert mock_execute_values.call_args.kwargs == {"page_size": 1, "fetch": True}
+    assert "WITH input (city_name, region_id) AS (VALUES %s)" in query
+    assert "ON CONFLICT (city_name, region_id) DO NOTHING" in query
+    assert "RETURNING city_name, region_id, city_id" in query
+    assert "FROM cities t JOIN input USING (city_name, region_id)" in query
+
+
+def test_get_or_insert_ids_without_keys(monkeypatch):
+    mock_execute_values = Mock()
+    monkeypatch.setattr("src.data_loader.execute_values", mock_execute_values)
+
+    assert _get_or_insert_ids(Mock(), "countries", ["country_name"], "country_id", []) == []
+    mock_execute_values.assert_not_called()
+
+# ------------------------
+# Tests for _lookup_ids
+# ------------------------
+def test_lookup_ids_selects_without_inserting(monkeypatch):
+    mock_cur = Mock()
+    keys = [["Berlin", 10], ["Paris", 11]]
+    mock_execute_values = Mock(return_value=[("Berlin", 10, 7)])
+    monkeypatch.setattr("src.data_loader.execute_values", mock_execute_values)
+
+    rows = _lookup_ids(mock_cur, "cities", ["city_name", "region_id"], "city_id", keys)
+
+    assert rows == [("Berlin", 10, 7)]
+    cur, query, sent_keys = mock_execute_values.call_args.args
+    assert cur is mock_cur
+    assert sent_keys == keys
+    assert mock_execute_values.call_args.kwargs == {"page_size": 2, "fetch": True}
+    assert "INSERT" not in query
+    assert "FROM cities t JOIN (VALUES %s) AS input (city_name, region_id) USING (city_name, region_id)" in query
+
+# ------------------------
+# Tests for resolve_locations
+# ------------------------
+def test_resolve_locations_maps_empty_region_to_unknown(monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.data_loader._lookup_ids", fake_lookup_ids({}))
+    monkeypatch.setattr("src.data_loader._get_or_insert_ids", fake_get_or_insert_ids(calls))
+    df = pd.DataFrame({"city": ["Paris", "Lyon"], "region": ["", "Rhone"], "country": ["France", "France"]})
+
+    resolve_locations(Mock(), df, "city", "region", "country")
+
+    tables = [table for table, *_ in calls]
+    assert tables == ["countries", "regions", "cities"]
+    assert calls[0][3] == [["France"]]
+    assert sorted(calls[1][3]) == [["Rhone", 100], ["Unknown", 100]]
+
+
+def test_resolve_locations_without_region_column(monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.data_loader._lookup_ids", fake_lookup_ids({}))
+    monkeypatch.setattr("src.data_loader._get_or_insert_ids", fake_get_or_insert_ids(calls))
+    df = pd.DataFrame({"city": ["Paris"], "country": ["France"]})
+
+    resolve_locations(Mock(), df, "city", "region", "country")
+
+    assert calls[1][3] == [["Unknown", 100]]
+
+
+def test_resolve_locations_keeps_city_ids_aligned_with_index(monkeypatch):
+    monkeypatch.setattr("src.data_loader._lookup_ids", fake_lookup_ids({}))
+    monkeypatch.setattr("src.data_loader._get_or_insert_ids", fake_get_or_insert_ids([]))
+    df = pd.DataFrame(
+        {
+            "city": ["Paris", "Berlin", "Paris", "Lyon"],
+            "region": ["", "", "", "Rhone"],
+            "country": ["France", "Germany", "France", "France"],
+        },
+        index=[30, 10, 40, 20],
+    )
+
+    city_ids = resolve_locations(Mock(), df, "city", "region", "country")
+
+    # Countries: France=100, Germany=101; regions: (Rhone, 100)=200, (Unknown, 100)=201,
+    # (Unknown, 101)=202; cities: (Berlin, 202)=300, (Lyon, 200)=301, (Paris, 201)=302
+    assert city_ids.index.tolist() == [30, 10, 40, 20]
+    assert city_ids.tolist() == [302, 300, 302, 301]
+
+def test_resolve_locations_inserts_only_missing_keys(monkeypatch):
+    inserted = []
+    existing = {
+        ("countries", ("France",)): 1,
+        ("regions", ("Unknown", 1)): 5,
+        ("cities", ("Paris", 5)): 9,
+    }
+    monkeypatch.setattr("src.data_loader._lookup_ids", fake_lookup_ids(existing))
+    monkeypatch.setattr("src.data_loader._get_or_insert_ids", fake_get_or_insert_ids(inserted))
+    df = pd.DataFrame({"city": ["Paris", "Lyon", "Paris"], "region": ["", "", ""], "country": ["France"] * 3})
+
+    city_ids = resolve_locations(Mock(), df, "city", "region", "country")
+
+    assert [(table, keys) for table, _, _, keys in inserted] == [
+        ("countries", []),
+        ("regions", []),
+        ("cities", [["Lyon", 5]]),
+    ]
+    assert city_ids.tolist() == [9, 300, 9]
+
+
+def test_resolve_locations_known_locations_insert_nothing(monkeypatch):
+    inserted = []
+    lookups = []
+    existing = {("countries", ("France",)): 1, ("regions", ("Unknown", 1)): 5, ("cities", ("Paris", 5)): 9}
+    monkeypatch.setattr("src.data_loader._lookup_ids", fake_lookup_ids(existing, lookups))
+    monkeypatch.setattr("src.data_loader._get_or_insert_ids", fake_get_or_insert_ids(inserted))
+    df = pd.DataFrame({"city": ["Paris"], "region": [""], "country": ["France"]})
+
+    resolve_locations(Mock(), df, "city", "region", "country")
+
+    assert [table for table, _ in lookups] == ["countries", "regions", "cities"]
+    assert all(keys == [] for *_, keys in inserted)
+
+# ------------------------
+# Tests for preload_locations
+# ------------------------
+def test_preload_locations_resolves_distinct_locations_once(monkeypatch, tmp_path):
+    mock_conn = MagicMock()
+    mock_cur = mock_conn.cursor.return_value.__enter__.return_value
+    resolved = []
+
+    @contextmanager
+    def mock_get_conn():
+        yield mock_conn
+
+    def mock_resolve_locations(cur, df, city_col, region_col, country_col):
+        resolved.append(df[[city_col, region_col, country_col]].values.tolist())
+
+    monkeypatch.setattr("src.data_loader.get_conn", mock_get_conn)
+    monkeypatch.setattr("src.data_loader.resolve_locations", mock_resolve_locations)
+    customers = tmp_path / "Customer.csv"
+    customers.write_text("city,region,country\nParis,,France\nSeattle,WA,USA\nParis,,France\n")
+    orders = tmp_path / "Order.csv"
+    orders.write_text("ship_city,ship_country\nParis,France\nLyon,France\n")
+
+    preload_locations([
+        (customers, "city", "region", "country"),
+        (orders, "ship_city", "ship_region", "ship_country"),
+    ])
+
+    mock_cur.execute.assert_called_once_with("SET LOCAL synchronous_commit TO OFF")
+    assert resolved == [[["Paris", "", "France"], ["Seattle", "WA", "USA"], ["Lyon", "", "France"]]]
+
+# ------------------------
+# Tests for save_csvs
+# ------------------------
+def test_save_csvs_consumes_generator(tmp_path):
+    def sheets():
+        yield "Category", pd.DataFrame({"CategoryName": ["Drinks", None]})
+        yield "Shipper", pd.DataFrame({"ShipperID": [1, 2]})
+
+    save_csvs(sheets(), tmp_path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["Category.csv", "Shipper.csv"]
+    assert (tmp_path / "Category.csv").read_text() == "category_name\nDrinks\n\"\"\n"
+    assert (tmp_path / "Shipper.csv").read_text() == "shipper_id\n1\n2\n"
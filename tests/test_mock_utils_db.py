@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from unittest.mock import Mock, MagicMock
 import pandas as pd
 
@@ -11,31 +12,44 @@ def test_get_or_create_country_existing():
     mock_cur.fetchone.return_value = [1]  # existing country_id
 
     country_id = get_or_create_country(mock_cur, "USA")
-    mock_cur.execute.assert_called_with(
-        "SELECT country_id FROM countries WHERE country_name = %s", ("USA",)
+    mock_cur.execute.assert_called_once_with(
+        """
+        WITH inserted AS (
+            INSERT INTO countries (country_name) VALUES (%s)
+            ON CONFLICT (country_name) DO NOTHING
+            RETURNING country_id
+        )
+        SELECT country_id FROM inserted
+        UNION ALL
+        SELECT country_id FROM countries WHERE country_name = %s
+    """, ("USA", "USA")
     )
     assert country_id == 1
 
 
 def test_get_or_create_country_new():
     mock_cur = Mock()
-    # first fetch returns None -> country does not exist
-    mock_cur.fetchone.side_effect = [None, [2]]  # new country_id returned after insert
+    mock_cur.fetchone.return_value = [2]  # new country_id returned by the insert
 
     country_id = get_or_create_country(mock_cur, "Canada")
-    # First SELECT
-    mock_cur.execute.assert_any_call(
-        "SELECT country_id FROM countries WHERE country_name = %s", ("Canada",)
-    )
-    # Then INSERT
-    mock_cur.execute.assert_any_call(
-        """
-        INSERT INTO countries (country_name) VALUES (%s)
-        RETURNING country_id
-    """, ("Canada",)
-    )
+    # Lookup and insert share one round trip
+    assert mock_cur.execute.call_count == 1
+    assert mock_cur.execute.call_args.args[1] == ("Canada", "Canada")
     assert country_id == 2
 
+
+def test_get_or_create_country_inserted_concurrently():
+    mock_cur = Mock()
+    # Another transaction committed the name while the combined statement waited
+    mock_cur.fetchone.side_effect = [None, [3]]
+
+    country_id = get_or_create_country(mock_cur, "Mexico")
+    assert mock_cur.execute.call_count == 2
+    assert mock_cur.execute.call_args.args == (
+        "SELECT country_id FROM countries WHERE country_name = %s", ("Mexico",)
+    )
+    assert country_id == 3
+
 # ------------------------
 # Tests for get_or_create_region
 # ------------------------
@@ -44,30 +58,43 @@ def test_get_or_create_region_existing():
     mock_cur.fetchone.return_value = [10]
 
     region_id = get_or_create_region(mock_cur, "California", 1)
-    mock_cur.execute.assert_called_with(
+    mock_cur.execute.assert_called_once_with(
         """
-        SELECT region_id FROM regions
-        WHERE region_name = %s AND country_id = %s
-    """, ("California", 1)
+        WITH inserted AS (
+            INSERT INTO regions (region_name, country_id) VALUES (%s, %s)
+            ON CONFLICT (region_name, country_id) DO NOTHING
+            RETURNING region_id
+        )
+        SELECT region_id FROM inserted
+        UNION ALL
+        SELECT region_id FROM regions WHERE region_name = %s AND country_id = %s
+    """, ("California", 1, "California", 1)
     )
     assert region_id == 10
 
 
 def test_get_or_create_region_new_empty_name():
     mock_cur = Mock()
-    mock_cur.fetchone.side_effect = [None, [11]]  # New region id returned after insert
+    mock_cur.fetchone.return_value = [11]  # New region id returned by the insert
 
     region_id = get_or_create_region(mock_cur, "", 1)
     # Should convert empty region_name to "Unknown"
-    mock_cur.execute.assert_any_call(
-        """
-        INSERT INTO regions (region_name, country_id)
-        VALUES (%s, %s)
-        RETURNING region_id
-    """, ("Unknown", 1)
-    )
+    assert mock_cur.execute.call_count == 1
+    assert mock_cur.execute.call_args.args[1] == ("Unknown", 1, "Unknown", 1)
     assert region_id == 11
 
+
+def test_get_or_create_region_inserted_concurrently():
+    mock_cur = Mock()
+    mock_cur.fetchone.side_effect = [None, [12]]
+
+    region_id = get_or_create_region(mock_cur, "", 1)
+    assert mock_cur.execute.call_count == 2
+    assert mock_cur.execute.call_args.args == (
+        "SELECT region_id FROM regions WHERE region_name = %s AND country_id = %s", ("Unknown", 1)
+    )
+    assert region_id == 12
+
 # ------------------------
 # Tests for get_or_create_city
 # ------------------------
@@ -76,28 +103,42 @@ def test_get_or_create_city_existing():
     mock_cur.fetchone.return_value = [100]
 
     city_id = get_or_create_city(mock_cur, "New York", 10)
-    mock_cur.execute.assert_called_with(
+    mock_cur.execute.assert_called_once_with(
         """
+        WITH inserted AS (
+            INSERT INTO cities (city_name, region_id) VALUES (%s, %s)
+            ON CONFLICT (city_name, region_id) DO NOTHING
+            RETURNING city_id
+        )
+        SELECT city_id FROM inserted
+        UNION ALL
         SELECT city_id FROM cities WHERE city_name = %s AND region_id = %s
-    """, ("New York", 10)
+    """, ("New York", 10, "New York", 10)
     )
     assert city_id == 100
 
 
 def test_get_or_create_city_new():
     mock_cur = Mock()
-    mock_cur.fetchone.side_effect = [None, [101]]
+    mock_cur.fetchone.return_value = [101]
 
     city_id = get_or_create_city(mock_cur, "Los Angeles", 10)
-    mock_cur.execute.assert_any_call(
-        """
-        INSERT INTO cities (city_name, region_id)
-        VALUES (%s, %s)
-        RETURNING city_id
-    """, ("Los Angeles", 10)
-    )
+    assert mock_cur.execute.call_count == 1
+    assert mock_cur.execute.call_args.args[1] == ("Los Angeles", 10, "Los Angeles", 10)
     assert city_id == 101
 
+
+def test_get_or_create_city_inserted_concurrently():
+    mock_cur = Mock()
+    mock_cur.fetchone.side_effect = [None, [102]]
+
+    city_id = get_or_create_city(mock_cur, "San Diego", 10)
+    assert mock_cur.execute.call_count == 2
+    assert mock_cur.execute.call_args.args == (
+        "SELECT city_id FROM cities WHERE city_name = %s AND region_id = %s", ("San Diego", 10)
+    )
+    assert city_id == 102
+
 # ------------------------
 # Tests for execute_query_on_db
 # ------------------------
@@ -105,8 +146,12 @@ def test_execute_query_on_db_success(monkeypatch):
     mock_conn = MagicMock()
     mock_df = pd.DataFrame({"id": [1, 2]})
 
-    # Patch psycopg2.connect and pd.read_sql_query
-    monkeypatch.setattr("psycopg2.connect", lambda dsn: mock_conn)
+    @contextmanager
+    def mock_get_readonly_conn():
+        yield mock_conn
+
+    # Patch the pooled connection and pd.read_sql_query
+    monkeypatch.setattr("src.utils.get_readonly_conn", mock_get_readonly_conn)
     monkeypatch.setattr("pandas.read_sql_query", lambda query, conn: mock_df)
 
     df = execute_query_on_db("SELECT * FROM cities")
@@ -116,7 +161,7 @@ def test_execute_query_on_db_success(monkeypatch):
 
 def test_execute_query_on_db_failure(monkeypatch):
     # Simulate exception in DB connection
-    monkeypatch.setattr("psycopg2.connect", lambda dsn: (_ for _ in ()).throw(Exception("DB error")))
+    monkeypatch.setattr("src.utils.get_readonly_conn", Mock(side_effect=Exception("DB error")))
 
     df = execute_query_on_db("SELECT * FROM cities")
     assert isinstance(df, pd.DataFrame)
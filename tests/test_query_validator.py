@@ -43,4 +43,42 @@ def test_non_select_statement_rejected():
     The validator should raise a ValueError if the query is not a SELECT statement.
     """
     with pytest.raises(ValueError, match="Only SELECT"):
-        QueryValidator.validate("Only SELECT statements are allowed.")
\ No newline at end of file
+        QueryValidator.validate("Only SELECT statements are allowed.")
+
+def test_rejects_dangerous_keyword_inside_select():
+    """
+    Test that a SELECT query containing a dangerous keyword is rejected
+    and the offending keyword is named in the error.
+    """
+    with pytest.raises(ValueError, match="Dangerous keyword detected: DROP"):
+        QueryValidator.validate("SELECT * FROM cities; drop table cities;")
+
+@pytest.mark.parametrize("query", [
+    "SELECT 1; COMMIT; SELECT * INTO stolen FROM customers LIMIT 1;",
+    "SELECT * FROM cities; SELECT * FROM customers",
+    "SELECT 1;;",
+])
+def test_rejects_multiple_statements(query):
+    """
+    Test that a query with a ';' anywhere but at the end is rejected, so no
+    second statement can run after the first (e.g. after a COMMIT).
+    """
+    with pytest.raises(ValueError, match="Only a single SQL statement is allowed."):
+        QueryValidator.validate(query)
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT * FROM cities\tlimit\t5", "SELECT * FROM cities\tlimit\t5"),
+    ("SELECT unlimited FROM cities;", "SELECT unlimited FROM cities LIMIT 1000;"),
+    ("SELECT * FROM cities\nLIMIT 5", "SELECT * FROM cities\nLIMIT 5"),
+    ("SELECT * FROM cities LiMiT 5;", "SELECT * FROM cities LiMiT 5;"),
+    # Non-ASCII queries skip the substring prefilter and go straight to the regex
+    ("SELECT * FROM cities WHERE city_name = 'Zürich' LIMIT 5", "SELECT * FROM cities WHERE city_name = 'Zürich' LIMIT 5"),
+    ("SELECT * FROM cities WHERE city_name = 'Zürich';", "SELECT * FROM cities WHERE city_name = 'Zürich' LIMIT 1000;"),
+    ("SELECT * FROM cities lımıt 5", "SELECT * FROM cities lımıt 5"),
+])
+def test_limit_detected_as_whole_word(query, expected):
+    """
+    Test that only LIMIT as a whole word, in any case and with any surrounding
+    whitespace, suppresses the appended 'LIMIT 1000'.
+    """
+    assert QueryValidator.validate(query) == expected
@@ -1,28 +1,93 @@
 from tests.mocks.mock_gemini_client import MockGeminiClient
-from src.text2sql_engine import generate_sql_query
+import asyncio
+from unittest.mock import patch
 
-def test_generate_sql_query_with_mock_client(monkeypatch):
-    # Create a mock client with custom SQL response
-    mock_client = MockGeminiClient("SELECT name FROM cities;")
-    
-    # Patch the client in your module
-    monkeypatch.setattr("src.text2sql_engine.client", mock_client)
+import pytest
+from src import text2sql_engine
+from src.text2sql_engine import generate_sql_query, generate_sql_query_async, sanitize_sql
+
+@pytest.fixture(autouse=True)
+def empty_generation_cache():
+    """Start every test without cached generations."""
+    text2sql_engine.generation_cache.clear()
+    yield
+    text2sql_engine.generation_cache.clear()
+
+@pytest.mark.parametrize("response, exception, expected", [
+    ("SELECT name FROM cities;", None, "SELECT name FROM cities;"),
+    (None, Exception("API failure"), ""),  # function should return empty string on API error
+])
+def test_generate_sql_query(response, exception, expected):
+    # Create a mock client with custom SQL response, or one whose API call fails
+    mock_client = MockGeminiClient(response)
+    if exception is not None:
+        mock_client.set_exception(exception)
 
-    # Call your function
-    result = generate_sql_query("Get all city names")
+    # Patch the client in your module and call your function
+    with patch("src.text2sql_engine.client", mock_client):
+        result = generate_sql_query("Get all city names")
 
     # Assertions
-    assert result == "SELECT name FROM cities;"
+    assert result == expected
     mock_client.models.generate_content.assert_called_once_with(
         model="gemini-2.5-flash",
         contents="Get all city names"
     )
 
-def test_generate_sql_query_with_exception(monkeypatch):
+def test_generate_sql_query_caches_generations():
+    mock_client = MockGeminiClient("SELECT name FROM cities;")
+
+    with patch("src.text2sql_engine.client", mock_client):
+        assert generate_sql_query("Get all city names") == "SELECT name FROM cities;"
+        assert asyncio.run(generate_sql_query_async("Get all city names")) == "SELECT name FROM cities;"
+
+    mock_client.models.generate_content.assert_called_once()
+    mock_client.aio.models.generate_content.assert_not_called()
+
+def test_generate_sql_query_does_not_cache_failures():
+    mock_client = MockGeminiClient()
+    mock_client.set_exception(Exception("API failure"))
+
+    with patch("src.text2sql_engine.client", mock_client):
+        assert generate_sql_query("Get all city names") == ""
+    assert not text2sql_engine.generation_cache
+
+@pytest.mark.parametrize("response", ["DROP TABLE cities;", "```sql\n```", "Sorry, I can't help with that."])
+def test_generate_sql_query_does_not_cache_invalid_sql(response):
+    mock_client = MockGeminiClient(response)
+
+    with patch("src.text2sql_engine.client", mock_client):
+        assert generate_sql_query("Get all city names") == response
+        assert generate_sql_query("Get all city names") == response
+
+    assert mock_client.models.generate_content.call_count == 2
+    assert not text2sql_engine.generation_cache
+
+def test_generate_sql_query_async_with_mock_client():
+    mock_client = MockGeminiClient("SELECT name FROM cities;")
+
+    with patch("src.text2sql_engine.client", mock_client):
+        result = asyncio.run(generate_sql_query_async("Get all city names"))
+
+    assert result == "SELECT name FROM cities;"
+    mock_client.aio.models.generate_content.assert_awaited_once_with(
+        model="gemini-2.5-flash",
+        contents="Get all city names"
+    )
+
+def test_generate_sql_query_async_with_exception():
     mock_client = MockGeminiClient()
     mock_client.set_exception(Exception("API failure"))
 
-    monkeypatch.setattr("src.text2sql_engine.client", mock_client)
+    with patch("src.text2sql_engine.client", mock_client):
+        result = asyncio.run(generate_sql_query_async("Get all city names"))
+    assert result == ""
 
-    result = generate_sql_query("Get all city names")
-    assert result == ""  # function should return empty string on API error
+@pytest.mark.parametrize("raw, expected", [
+    ("SELECT 1;", "SELECT 1;"),
+    ("  SELECT \u2014 1;\n", "SELECT  1;"),
+    ("Here you go:\n```SQL\nSELECT * FROM cities;\n```\nDone.", "SELECT * FROM cities;"),
+    ("```sql SELECT 1; without a closing fence", "```sql SELECT 1; without a closing fence"),
+])
+def test_sanitize_sql(raw, expected):
+    assert sanitize_sql(raw) == expected
@@ -1,5 +1,5 @@
 import pytest
-from src.utils import to_snake_case
+from src.utils import to_snake_case, to_snake_case_index
 import pandas as pd
 
 # ----------------------
@@ -13,7 +13,10 @@ import pandas as pd
         ("  leadingSpace", "leading_space"),
         ("snake_case", "snake_case"),
         ("with space", "withspace"),
-        ("mixedCASEString", "mixed_case_string")
+        ("mixedCASEString", "mixed_case_string"),
+        ("HTTPResponse", "http_response"),
+        ("XMLHTTPRequest", "xmlhttp_request"),
+        ("Version2X", "version2_x")
     ]
 )
 def test_to_snake_case(input_str, expected):
@@ -26,3 +29,10 @@ def test_to_snake_case(input_str, expected):
     assert to_snake_case(input_str) == expected
 
 
+def test_to_snake_case_index_matches_to_snake_case():
+    """
+    Test that the vectorized to_snake_case_index gives the same result as
+    calling to_snake_case on each label.
+    """
+    labels = ["CamelCase", "PascalCase", "  leadingSpace", "snake_case", "with space", "mixedCASEString", 42]
+    assert list(to_snake_case_index(labels)) == [to_snake_case(label) for label in labels]